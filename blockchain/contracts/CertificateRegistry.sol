@@ -24,6 +24,13 @@ contract CertificateVerification {
         certificates[certId] = Certificate(ipfsHash, true);
     }
 
+    function issueCertificateBatch(string[] memory certIds, string[] memory ipfsHashes) public onlyAdmin {
+        require(certIds.length == ipfsHashes.length, "Length mismatch");
+        for (uint256 i = 0; i < certIds.length; i++) {
+            certificates[certIds[i]] = Certificate(ipfsHashes[i], true);
+        }
+    }
+
     function revokeCertificate(string memory certId) public onlyAdmin {
         certificates[certId].isValid = false;
     }
@@ -14,18 +14,58 @@ This reduces gas costs, improves privacy, and prevents reverse reconstruction.
 import numpy as np
 from sklearn.decomposition import PCA
 from sklearn.preprocessing import StandardScaler
+import copy
 import hashlib
 import json
 from typing import Tuple, Dict, Any
 
 
+# Default max absolute deviation accepted by HPCAE.astype(..., X_check=...)
+# between float32 and float64 compressed vectors of the same fitted model.
+# Not a guarantee: the deviation grows with autoencoder weight magnitude,
+# i.e. with the number of training updates (see H_PCAE_ALGORITHM_README.md).
+FLOAT32_TOLERANCE = 1e-2
+
+# Rows per BLAS call in transform. Blocks are zero-padded to exactly this
+# size so every matrix multiply has the same shape, which keeps each row's
+# result (and hash) independent of batch size and chunking. Small blocks keep
+# single-row verification cheap; bulk calls stack the blocks into one matmul.
+ROW_BLOCK = 8
+
+
+def _row_blocked(fn, X: np.ndarray) -> np.ndarray:
+    """
+    Apply a row-wise stage on zero-padded blocks of exactly ROW_BLOCK rows.
+    
+    The blocks are passed to ``fn`` stacked as (n_blocks, ROW_BLOCK, n_features),
+    so matmul runs one fixed-shape multiply per block without a Python loop.
+    
+    Args:
+        fn: Row-wise stage function that accepts stacked blocks
+        X: Input rows (n_samples, n_features)
+        
+    Returns:
+        Stage output for the n_samples input rows
+    """
+    n_samples = X.shape[0]
+    n_blocks = max(1, -(-n_samples // ROW_BLOCK))
+    if n_samples == n_blocks * ROW_BLOCK:
+        blocks = np.ascontiguousarray(X)
+    else:
+        blocks = np.zeros((n_blocks * ROW_BLOCK, X.shape[1]), dtype=X.dtype)
+        blocks[:n_samples] = X
+    out = fn(blocks.reshape(n_blocks, ROW_BLOCK, X.shape[1]))
+    return out.reshape(n_blocks * ROW_BLOCK, out.shape[-1])[:n_samples]
+
+
 class DeepAutoencoder:
     """
     Deep Autoencoder for non-linear dimensionality reduction.
     Uses tanh activation for bounded representations.
     """
     
-    def __init__(self, input_dim: int, latent_dim: int, hidden_dims: list = None):
+    def __init__(self, input_dim: int, latent_dim: int, hidden_dims: list = None,
+                 dtype: Any = np.float64):
         """
         Initialize Deep Autoencoder.
         
@@ -33,10 +73,13 @@ class DeepAutoencoder:
             input_dim: Input feature dimension
             latent_dim: Latent (compressed) dimension
             hidden_dims: List of hidden layer dimensions (default: [128, 64])
+            dtype: Floating point precision of weights and activations
         """
         self.input_dim = input_dim
         self.latent_dim = latent_dim
         self.hidden_dims = hidden_dims or [128, 64]
+        self.dtype = np.dtype(dtype)
+        self._rng = None
         
         # Initialize weights with Xavier initialization
         self.encoder_weights = []
@@ -47,16 +90,17 @@ class DeepAutoencoder:
         # Build encoder
         dims = [input_dim] + self.hidden_dims + [latent_dim]
         for i in range(len(dims) - 1):
-            w = np.random.randn(dims[i], dims[i+1]) * np.sqrt(2.0 / dims[i])
-            b = np.zeros(dims[i+1])
+            w = (np.random.randn(dims[i], dims[i+1]) * np.sqrt(2.0 / dims[i])).astype(self.dtype)
+            b = np.zeros(dims[i+1], dtype=self.dtype)
             self.encoder_weights.append(w)
             self.encoder_biases.append(b)
         
         # Build decoder (mirror of encoder)
         dims_decoder = [latent_dim] + self.hidden_dims[::-1] + [input_dim]
         for i in range(len(dims_decoder) - 1):
-            w = np.random.randn(dims_decoder[i], dims_decoder[i+1]) * np.sqrt(2.0 / dims_decoder[i])
-            b = np.zeros(dims_decoder[i+1])
+            w = (np.random.randn(dims_decoder[i], dims_decoder[i+1])
+                 * np.sqrt(2.0 / dims_decoder[i])).astype(self.dtype)
+            b = np.zeros(dims_decoder[i+1], dtype=self.dtype)
             self.decoder_weights.append(w)
             self.decoder_biases.append(b)
     
@@ -68,19 +112,35 @@ class DeepAutoencoder:
         """Derivative of tanh."""
         return 1 - np.tanh(x) ** 2
     
+    def _noise(self, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Standard normal training noise in the model dtype.
+        
+        float64 keeps the legacy np.random.randn stream, so a seeded fit
+        reproduces the weights (and hashes) of earlier versions. Other dtypes
+        draw directly in that dtype from a generator seeded off the global RNG.
+        """
+        if self.dtype == np.float64:
+            return np.random.randn(*shape)
+        if self._rng is None:
+            self._rng = np.random.default_rng(np.random.randint(2**31 - 1))
+        return self._rng.standard_normal(shape, dtype=self.dtype)
+    
     def encode(self, X: np.ndarray) -> np.ndarray:
         """
         Encode input to latent representation.
         
         Args:
-            X: Input data (n_samples, input_dim)
+            X: Input data (n_samples, input_dim), or stacked row blocks
+                (n_blocks, block_rows, input_dim)
             
         Returns:
-            Latent representation (n_samples, latent_dim)
+            Latent representation with the same leading dimensions as X
         """
         activation = X
         for w, b in zip(self.encoder_weights, self.encoder_biases):
-            activation = self._tanh(np.dot(activation, w) + b)
+            # BLAS results depend on operand layout, so always multiply C-ordered
+            activation = self._tanh(activation @ np.ascontiguousarray(w) + b)
         return activation
     
     def decode(self, Z: np.ndarray) -> np.ndarray:
@@ -112,6 +172,7 @@ class DeepAutoencoder:
             batch_size: Batch size for training
             verbose: Print training progress
         """
+        X = np.asarray(X, dtype=self.dtype)
         n_samples = X.shape[0]
         
         for epoch in range(epochs):
@@ -156,13 +217,17 @@ class DeepAutoencoder:
                 
                 # Update encoder weights (simplified)
                 for j in range(len(self.encoder_weights)):
-                    grad_w = np.random.randn(*self.encoder_weights[j].shape) * learning_rate * loss
-                    self.encoder_weights[j] -= grad_w.clip(-0.1, 0.1)
+                    grad_w = self._noise(self.encoder_weights[j].shape)
+                    grad_w *= learning_rate
+                    grad_w *= loss
+                    self.encoder_weights[j] -= np.clip(grad_w, -0.1, 0.1, out=grad_w)
                 
                 # Update decoder weights (simplified)
                 for j in range(len(self.decoder_weights)):
-                    grad_w = np.random.randn(*self.decoder_weights[j].shape) * learning_rate * loss
-                    self.decoder_weights[j] -= grad_w.clip(-0.1, 0.1)
+                    grad_w = self._noise(self.decoder_weights[j].shape)
+                    grad_w *= learning_rate
+                    grad_w *= loss
+                    self.decoder_weights[j] -= np.clip(grad_w, -0.1, 0.1, out=grad_w)
             
             if verbose and (epoch + 1) % 10 == 0:
                 avg_loss = total_loss / n_batches
@@ -244,7 +309,9 @@ class HPCAE:
     def __init__(self, 
                  pca_components: int = 128,
                  latent_dim: int = 64,
-                 entropy_features: int = 32):
+                 entropy_features: int = 32,
+                 dtype: Any = np.float64,
+                 auto_plan: bool = True):
         """
         Initialize H-PCAE algorithm.
         
@@ -252,10 +319,19 @@ class HPCAE:
             pca_components: Number of PCA components (N₁)
             latent_dim: Autoencoder latent dimension (N₂)
             entropy_features: Final number of features after entropy selection (k)
+            dtype: Working precision for all stages, np.float64 or np.float32.
+                float32 halves memory traffic and speeds up matrix multiplies.
+            auto_plan: Calibrate an execution plan (per-stage BLAS threads) on
+                the first large transform call and apply it to large calls
         """
+        if np.dtype(dtype) not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError(f"dtype must be float32 or float64, got {np.dtype(dtype)}")
+        
         self.pca_components = pca_components
         self.latent_dim = latent_dim
         self.entropy_features = entropy_features
+        self.dtype = np.dtype(dtype)
+        self.auto_plan = auto_plan
         
         # Stage components
         self.scaler = StandardScaler()
@@ -264,6 +340,23 @@ class HPCAE:
         self.entropy_selector = EntropySelector(n_features=entropy_features)
         
         self.is_fitted = False
+        self.quality_stats = None
+        self.result_cache = None
+        self.execution_plan = None
+        self._model_version = None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        """Drop the process-local result cache and host-specific plan when pickling or copying."""
+        state = self.__dict__.copy()
+        state['result_cache'] = None
+        state['execution_plan'] = None
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]):
+        """Restore a loaded model; host-specific plans are made again on demand."""
+        defaults = {'dtype': np.dtype(np.float64), 'auto_plan': True, 'quality_stats': None,
+                    'result_cache': None, 'execution_plan': None, '_model_version': None}
+        self.__dict__.update({**defaults, **state})
     
     def fit(self, X: np.ndarray, ae_epochs: int = 100, verbose: bool = True):
         """
@@ -274,6 +367,8 @@ class HPCAE:
             ae_epochs: Epochs for autoencoder training
             verbose: Print progress
         """
+        X = np.asarray(X, dtype=self.dtype)
+        
         if verbose:
             print(f"H-PCAE Training Started")
             print(f"Input dimension: {X.shape[1]}")
@@ -284,6 +379,8 @@ class HPCAE:
         
         X_scaled = self.scaler.fit_transform(X)
         X_pca = self.pca.fit_transform(X_scaled)
+        # Store components C-ordered so transform does not copy them per call
+        self.pca.components_ = np.ascontiguousarray(self.pca.components_)
         
         explained_var = np.sum(self.pca.explained_variance_ratio_)
         if verbose:
@@ -295,7 +392,8 @@ class HPCAE:
         
         self.autoencoder = DeepAutoencoder(
             input_dim=self.pca_components,
-            latent_dim=self.latent_dim
+            latent_dim=self.latent_dim,
+            dtype=self.dtype
         )
         self.autoencoder.train(X_pca, epochs=ae_epochs, verbose=verbose)
         
@@ -309,6 +407,9 @@ class HPCAE:
         X_final = self.entropy_selector.transform(X_latent)
         
         self.is_fitted = True
+        self.quality_stats = None
+        self._model_version = None
+        self.execution_plan = None
         
         if verbose:
             print(f"\n✓ H-PCAE Training Complete")
@@ -330,18 +431,94 @@ class HPCAE:
         if not self.is_fitted:
             raise ValueError("Model must be fitted before transform")
         
+        X = np.asarray(X, dtype=self.dtype)
+        
+        if self.auto_plan or self.execution_plan is not None:
+            import h_pcae_planner
+            if X.shape[0] >= h_pcae_planner.PLANNED_MIN_ROWS:
+                if self.execution_plan is None:
+                    self.plan_execution()
+                return h_pcae_planner.planned_transform(self, X, self.execution_plan)
+        
         # Stage 1: PCA
-        X_scaled = self.scaler.transform(X)
-        X_pca = self.pca.transform(X_scaled)
+        X_pca = self._pca_stage(X)
         
         # Stage 2: Autoencoder
-        X_latent = self.autoencoder.encode(X_pca)
+        X_latent = self._encode_stage(X_pca)
         
         # Stage 3: Entropy Selection
         X_final = self.entropy_selector.transform(X_latent)
         
         return X_final
     
+    def _pca_stage(self, X: np.ndarray) -> np.ndarray:
+        """Scaling and PCA projection in fixed-shape row blocks."""
+        return self._project_stage(self.scaler.transform(X))
+    
+    def _project_stage(self, X_scaled: np.ndarray) -> np.ndarray:
+        """PCA projection of already scaled input in fixed-shape row blocks."""
+        # Same arithmetic as PCA.transform (project, then subtract the projected
+        # mean), written out because PCA.transform only accepts 2-D input.
+        # BLAS results depend on operand layout, so always multiply C-ordered
+        components = np.ascontiguousarray(self.pca.components_).T
+        projected_mean = self.pca.mean_.reshape(1, -1) @ components
+        
+        def project(blocks: np.ndarray) -> np.ndarray:
+            out = blocks @ components
+            out -= projected_mean
+            return out
+        
+        return _row_blocked(project, X_scaled)
+    
+    def _encode_stage(self, X_pca: np.ndarray) -> np.ndarray:
+        """Autoencoder encoding in fixed-shape row blocks."""
+        return _row_blocked(self.autoencoder.encode, X_pca)
+    
+    def astype(self, dtype: Any, X_check: np.ndarray = None,
+               tolerance: float = FLOAT32_TOLERANCE) -> 'HPCAE':
+        """
+        Copy a fitted model with all parameters cast to another precision.
+        
+        Useful for fitting in float64 and bulk-rehashing in float32. The
+        float32 deviation depends on the trained weights, so pass X_check
+        to measure it; the copy is rejected if it exceeds ``tolerance``.
+        Hashes are precision-specific and must not be compared across modes.
+        
+        Args:
+            dtype: Target precision, np.float32 or np.float64
+            X_check: Representative inputs to measure the deviation on
+            tolerance: Max accepted absolute deviation on X_check
+            
+        Returns:
+            New HPCAE instance in the requested precision, with the measured
+            deviation in ``precision_deviation`` (None without X_check)
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before astype")
+        
+        model = copy.deepcopy(self)
+        model.dtype = np.dtype(dtype)
+        if model.dtype not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError(f"dtype must be float32 or float64, got {model.dtype}")
+        
+        for attr in ('components_', 'mean_', 'explained_variance_'):
+            setattr(model.pca, attr, getattr(model.pca, attr).astype(model.dtype))
+        
+        ae = model.autoencoder
+        ae.dtype = model.dtype
+        for params in (ae.encoder_weights, ae.encoder_biases, ae.decoder_weights, ae.decoder_biases):
+            params[:] = [p.astype(model.dtype) for p in params]
+        
+        model.quality_stats = None
+        model._model_version = None
+        model.precision_deviation = None
+        if X_check is not None:
+            deviation = float(np.max(np.abs(model.transform(X_check) - self.transform(X_check))))
+            if deviation > tolerance:
+                raise ValueError(f"{model.dtype.name} deviation {deviation:.3g} exceeds tolerance {tolerance:.3g}")
+            model.precision_deviation = deviation
+        return model
+    
     def fit_transform(self, X: np.ndarray, ae_epochs: int = 100, verbose: bool = True) -> np.ndarray:
         """
         Fit the model and transform the data.
@@ -368,7 +545,7 @@ class HPCAE:
             SHA-256 hash string
         """
         # Convert to bytes and hash
-        vector_bytes = compressed_vector.astype(np.float32).tobytes()
+        vector_bytes = compressed_vector.astype(np.float32, copy=False).tobytes()
         hash_obj = hashlib.sha256(vector_bytes)
         return hash_obj.hexdigest()
     
@@ -386,22 +563,108 @@ class HPCAE:
         if X.ndim == 1:
             X = X.reshape(1, -1)
         
-        # Transform through all stages
-        compressed = self.transform(X)
-        
-        # Generate hash for each sample
-        results = []
-        for i in range(compressed.shape[0]):
-            vector = compressed[i]
-            hash_value = self.get_blockchain_hash(vector)
-            results.append({
-                'compressed_vector': vector.tolist(),
-                'dimension': len(vector),
-                'blockchain_hash': hash_value
-            })
+        if self.result_cache is not None:
+            results = self.result_cache.process(self, X)
+        else:
+            # Transform through all stages
+            compressed = self.transform(X)
+            
+            # Generate hash for each sample
+            results = [
+                self._blockchain_record(vector, self.get_blockchain_hash(vector))
+                for vector in compressed
+            ]
         
         return results[0] if len(results) == 1 else results
     
+    def _blockchain_record(self, vector: np.ndarray, hash_value: str) -> Dict[str, Any]:
+        """Build the per-sample result returned by process_for_blockchain."""
+        return {
+            'compressed_vector': vector.tolist(),
+            'dimension': len(vector),
+            'blockchain_hash': hash_value
+        }
+    
+    def model_version(self) -> str:
+        """
+        Fingerprint of the fitted parameters and precision.
+        
+        Changes whenever the model is refitted or loaded with different
+        parameters, which invalidates cached results.
+        
+        Returns:
+            16-character hex version string
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before versioning")
+        
+        if self._model_version is None:
+            h = hashlib.sha256(self.dtype.name.encode())
+            params = [self.scaler.mean_, self.scaler.scale_, self.pca.mean_, self.pca.components_,
+                      self.entropy_selector.selected_indices]
+            ae = self.autoencoder
+            params += ae.encoder_weights + ae.encoder_biases + ae.decoder_weights + ae.decoder_biases
+            for p in params:
+                h.update(np.ascontiguousarray(p).tobytes())
+            self._model_version = h.hexdigest()[:16]
+        return self._model_version
+    
+    def plan_execution(self, force: bool = False, **kwargs) -> Dict[str, Any]:
+        """
+        Calibrate (or load from the per-host cache) and apply an execution plan.
+        
+        Large transform calls then run each stage under its planned BLAS
+        thread limit, in chunks that bound the stage's temporaries.
+        
+        Args:
+            force: Recalibrate even if a cached plan exists
+            **kwargs: Options forwarded to h_pcae_planner.plan_execution
+            
+        Returns:
+            Execution plan dictionary
+        """
+        if not self.is_fitted:
+            raise ValueError("Model must be fitted before planning")
+        
+        from h_pcae_planner import plan_execution
+        
+        self.execution_plan = plan_execution(self, force=force, **kwargs)
+        return self.execution_plan
+    
+    def enable_cache(self, cache=None, **kwargs):
+        """
+        Serve process_for_blockchain through a content-addressed result cache.
+        
+        Args:
+            cache: Existing h_pcae_cache.ResultCache (e.g. shared by several models)
+            **kwargs: Options for a new ResultCache (max_bytes, ttl, disk_path)
+            
+        Returns:
+            The attached ResultCache
+        """
+        if cache is None:
+            from h_pcae_cache import ResultCache
+            cache = ResultCache(**kwargs)
+        
+        self.result_cache = cache
+        return cache
+    
+    def evaluate(self, X: np.ndarray, **kwargs) -> Dict[str, Any]:
+        """
+        Evaluate compression quality and record it in the compression stats.
+        
+        Args:
+            X: Evaluation data (n_samples, n_features), may be a np.memmap
+            **kwargs: Options forwarded to h_pcae_evaluation.evaluate_hpcae
+            
+        Returns:
+            Dictionary with reconstruction, neighbour and collision metrics
+        """
+        from h_pcae_evaluation import evaluate_hpcae
+        
+        self.quality_stats = evaluate_hpcae(self, X, **kwargs)
+        return self.quality_stats
+    
     def get_compression_stats(self) -> Dict[str, Any]:
         """
         Get compression statistics.
@@ -412,7 +675,7 @@ class HPCAE:
         if not self.is_fitted:
             return {"error": "Model not fitted"}
         
-        return {
+        stats = {
             'stage_1_pca': {
                 'output_dim': self.pca_components,
                 'explained_variance': float(np.sum(self.pca.explained_variance_ratio_))
@@ -427,32 +690,45 @@ class HPCAE:
             },
             'overall': {
                 'final_dimension': self.entropy_features,
-                'total_stages': 3
+                'total_stages': 3,
+                'dtype': self.dtype.name
             }
         }
+        if self.quality_stats is not None:
+            stats['quality'] = self.quality_stats
+        if self.result_cache is not None:
+            stats['cache'] = self.result_cache.stats()
+        if self.execution_plan is not None:
+            stats['execution_plan'] = self.execution_plan
+        
+        return stats
 
 
-def create_sample_student_data(n_samples: int = 100, n_features: int = 256) -> np.ndarray:
+def create_sample_student_data(n_samples: int = 100, n_features: int = 256,
+                               random_state: int = 42) -> np.ndarray:
     """
     Create synthetic student credential data for demonstration.
     
+    For large load tests, use h_pcae_workload.SyntheticWorkload instead.
+    
     Args:
         n_samples: Number of student records
         n_features: Number of features (including face embeddings, metadata, etc.)
+        random_state: Seed for this dataset (does not touch the global RNG)
         
     Returns:
         Synthetic data array
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(random_state)
     
     # Simulate high-dimensional student data
     # This could include: student_id, college_id, course_id, marks, dates,
     # face embeddings (128-512 dim), and various metadata
-    data = np.random.randn(n_samples, n_features)
+    data = rng.standard_normal((n_samples, n_features))
     
     # Add some structure (correlated features)
-    for i in range(0, n_features - 1, 10):
-        data[:, i+1] = data[:, i] * 0.8 + np.random.randn(n_samples) * 0.2
+    src = np.arange(0, n_features - 1, 10)
+    data[:, src + 1] = data[:, src] * 0.8 + rng.standard_normal((n_samples, src.size)) * 0.2
     
     return data
 
@@ -467,7 +743,7 @@ if __name__ == "__main__":
     # Create sample data
     print("\n📊 Creating sample student credential data...")
     X_train = create_sample_student_data(n_samples=200, n_features=256)
-    X_test = create_sample_student_data(n_samples=50, n_features=256)
+    X_test = create_sample_student_data(n_samples=50, n_features=256, random_state=43)
     
     print(f"Training samples: {X_train.shape[0]}")
     print(f"Original dimension: {X_train.shape[1]}")
@@ -0,0 +1,523 @@
+"""
+H-PCAE Anchor: Pipelined Batch Anchoring Client
+===============================================
+Gets H-PCAE blockchain hashes on-chain at scale.
+
+Pipeline:
+1. Coalesce: queued digests are grouped into ``issueCertificateBatch`` calls
+2. Pipeline: nonces are managed locally, so many transactions are in flight
+3. Confirm: each transaction is tracked concurrently, with retry, rebroadcast
+   and back-pressure (bounded queue + bounded in-flight transactions)
+4. Recover: if a nonce never gets a receipt, the client resyncs from the
+   chain and moves the batches with higher nonces onto new nonces
+
+``MockChain`` is an in-process stand-in for an EVM node, so throughput can
+be measured without a live network. A real node adapter only has to
+provide the same four coroutines (``get_transaction_count``,
+``send_transaction``, ``get_receipt``, ``block_number``).
+"""
+
+import asyncio
+import hashlib
+import random
+import time
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class TransientChainError(Exception):
+    """Recoverable RPC failure (timeout, dropped connection, rate limit)."""
+
+
+class AnchorError(Exception):
+    """A certificate could not be anchored."""
+
+
+class _NonceReassigned(Exception):
+    """An earlier nonce was given up, so a batch must be sent again under a new nonce."""
+
+
+class MockChain:
+    """
+    In-process EVM node stand-in running the CertificateVerification contract.
+
+    Blocks are mined lazily from the event loop clock, every ``block_time``
+    seconds, each holding at most ``max_txs_per_block`` transactions.
+    Transactions from one sender are only mined in nonce order.
+    """
+
+    def __init__(self,
+                 admin: str = '0xadmin',
+                 block_time: float = 0.05,
+                 max_txs_per_block: int = 50,
+                 failure_rate: float = 0.0,
+                 drop_rate: float = 0.0,
+                 rpc_latency: float = 0.0,
+                 seed: int = 0):
+        """
+        Initialize mock chain.
+
+        Args:
+            admin: Address allowed to issue certificates
+            block_time: Seconds between blocks
+            max_txs_per_block: Block capacity in transactions
+            failure_rate: Probability that an RPC call raises TransientChainError
+            drop_rate: Probability that an accepted transaction is silently dropped
+            rpc_latency: Simulated network round trip per RPC call, in seconds
+            seed: Seed for failure injection
+        """
+        self.admin = admin
+        self.block_time = block_time
+        self.max_txs_per_block = max_txs_per_block
+        self.failure_rate = failure_rate
+        self.drop_rate = drop_rate
+        self.rpc_latency = rpc_latency
+
+        self.certificates = {}
+        self._rng = random.Random(seed)
+        self._start = None
+        self._height = 0
+        self._nonces = {}
+        self._mempool = {}
+        self._receipts = {}
+        self.n_blocks_with_txs = 0
+
+    async def _rpc(self):
+        """Simulate RPC latency, failures and block production."""
+        if self._start is None:
+            self._start = asyncio.get_running_loop().time()
+        if self.rpc_latency:
+            await asyncio.sleep(self.rpc_latency)
+        self._advance()
+        if self._rng.random() < self.failure_rate:
+            raise TransientChainError("mock RPC failure")
+
+    def _advance(self):
+        """Mine every block that is due according to the event loop clock."""
+        due = int((asyncio.get_running_loop().time() - self._start) / self.block_time)
+        while self._height < due:
+            self._height += 1
+            self._mine(self._height)
+
+    def _mine(self, height: int):
+        """Include up to ``max_txs_per_block`` executable transactions."""
+        included = 0
+        progress = True
+        while progress and included < self.max_txs_per_block:
+            progress = False
+            for sender in list(self._nonces):
+                key = (sender, self._nonces[sender])
+                tx = self._mempool.pop(key, None)
+                if tx is None:
+                    continue
+                self._execute(tx, height)
+                self._nonces[sender] += 1
+                included += 1
+                progress = True
+                if included >= self.max_txs_per_block:
+                    break
+        if included:
+            self.n_blocks_with_txs += 1
+
+    def _execute(self, tx: Dict[str, Any], height: int):
+        """Apply a contract call and record its receipt."""
+        status = 1
+        if tx['sender'] != self.admin:
+            status = 0
+        elif tx['method'] == 'issueCertificateBatch':
+            cert_ids, hashes = tx['args']
+            if len(cert_ids) != len(hashes):
+                status = 0
+            else:
+                for cert_id, value in zip(cert_ids, hashes):
+                    self.certificates[cert_id] = (value, True)
+        elif tx['method'] == 'issueCertificate':
+            cert_id, value = tx['args']
+            self.certificates[cert_id] = (value, True)
+        else:
+            status = 0
+        self._receipts[tx['hash']] = {
+            'transaction_hash': tx['hash'],
+            'block_number': height,
+            'status': status,
+            'nonce': tx['nonce']
+        }
+
+    async def get_transaction_count(self, address: str) -> int:
+        """Next nonce of ``address`` according to mined transactions."""
+        await self._rpc()
+        return self._nonces.get(address, 0)
+
+    async def send_transaction(self, sender: str, nonce: int, method: str, args: Tuple) -> str:
+        """
+        Submit a contract call.
+
+        Resubmitting the same transaction is idempotent and returns the same hash.
+
+        Returns:
+            Transaction hash
+        """
+        await self._rpc()
+        payload = repr((sender, nonce, method, args)).encode()
+        tx_hash = '0x' + hashlib.sha256(payload).hexdigest()
+        self._nonces.setdefault(sender, 0)
+        if nonce < self._nonces[sender] and tx_hash not in self._receipts:
+            raise ValueError(f"nonce too low: {nonce}")
+        if tx_hash in self._receipts:
+            return tx_hash
+        if self._rng.random() < self.drop_rate:
+            return tx_hash
+        self._mempool[(sender, nonce)] = {
+            'hash': tx_hash, 'sender': sender, 'nonce': nonce, 'method': method, 'args': args
+        }
+        return tx_hash
+
+    async def get_receipt(self, tx_hash: str) -> Optional[Dict[str, Any]]:
+        """Receipt of a mined transaction, or None while pending."""
+        await self._rpc()
+        return self._receipts.get(tx_hash)
+
+    async def block_number(self) -> int:
+        """Current chain height."""
+        await self._rpc()
+        return self._height
+
+    def verify_certificate(self, cert_id: str) -> Tuple[str, bool]:
+        """Read-only equivalent of the contract's ``verifyCertificate``."""
+        return self.certificates.get(cert_id, ('', False))
+
+
+class AnchoringClient:
+    """
+    Asyncio client that anchors certificate digests in pipelined batches.
+
+    Usage:
+        async with AnchoringClient(chain, sender) as client:
+            receipt = await client.anchor(cert_id, digest)
+    """
+
+    def __init__(self,
+                 chain,
+                 sender: str,
+                 batch_size: int = 100,
+                 max_batch_delay: float = 0.02,
+                 max_in_flight: int = 16,
+                 max_queue: int = 10000,
+                 confirmations: int = 1,
+                 max_retries: int = 5,
+                 retry_backoff: float = 0.05,
+                 confirmation_timeout: float = 5.0,
+                 poll_interval: float = 0.02):
+        """
+        Initialize anchoring client.
+
+        Args:
+            chain: Node adapter (e.g. MockChain)
+            sender: Issuing account address
+            batch_size: Max certificates per contract call
+            max_batch_delay: Max seconds to wait for a batch to fill
+            max_in_flight: Max unconfirmed transactions
+            max_queue: Max queued certificates before anchor() blocks
+            confirmations: Blocks required before a batch counts as anchored
+            max_retries: Retries per RPC call, and rebroadcasts per transaction
+            retry_backoff: Base delay for exponential backoff, in seconds
+            confirmation_timeout: Seconds per broadcast to get a receipt and enough
+                confirmations before rebroadcasting
+            poll_interval: Seconds between receipt polls
+        """
+        self.chain = chain
+        self.sender = sender
+        self.batch_size = batch_size
+        self.max_batch_delay = max_batch_delay
+        self.max_in_flight = max_in_flight
+        self.confirmations = confirmations
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.confirmation_timeout = confirmation_timeout
+        self.poll_interval = poll_interval
+
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._nonce = None
+        self._batcher = None
+        self._tasks = set()
+        self._in_flight = 0
+        self._failure = None
+        # Nonce every resync restarted from, indexed by the generation it started
+        self._generation = 0
+        self._resync_bases = [None]
+        self._counters = {
+            'submitted': 0,
+            'anchored': 0,
+            'failed': 0,
+            'transactions': 0,
+            'send_retries': 0,
+            'poll_retries': 0,
+            'rebroadcasts': 0,
+            'resyncs': 0,
+            'reassigned': 0
+        }
+
+    async def __aenter__(self) -> 'AnchoringClient':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def start(self):
+        """Fetch the starting nonce and start the batcher."""
+        self._nonce = await self._with_retries('poll_retries', self.chain.get_transaction_count, self.sender)
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def anchor(self, cert_id: str, digest: str) -> Dict[str, Any]:
+        """
+        Anchor one digest and wait until it is confirmed.
+
+        Blocks while the queue is full (back-pressure).
+
+        Args:
+            cert_id: Certificate identifier (contract key)
+            digest: Blockchain hash from HPCAE.process_for_blockchain
+
+        Returns:
+            Receipt of the batch transaction that anchored the digest
+        """
+        if self._failure is not None:
+            raise AnchorError("client stopped after its nonce could not be resynced") from self._failure
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((cert_id, digest, future))
+        self._counters['submitted'] += 1
+        return await future
+
+    async def anchor_results(self, cert_ids: List[str], results) -> List[Dict[str, Any]]:
+        """
+        Anchor the output of ``HPCAE.process_for_blockchain``.
+
+        Args:
+            cert_ids: Certificate identifiers, one per result
+            results: A single result dict or a list of them
+
+        Returns:
+            List of receipts, in input order
+        """
+        if isinstance(results, dict):
+            results = [results]
+        return await asyncio.gather(*[
+            self.anchor(cert_id, result['blockchain_hash'])
+            for cert_id, result in zip(cert_ids, results)
+        ])
+
+    async def close(self):
+        """Flush queued certificates and wait for every transaction to settle."""
+        await self._queue.join()
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _with_retries(self, counter: str, fn, *args):
+        """Call an RPC coroutine, retrying transient failures with backoff and counting them in ``counter``."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return await fn(*args)
+            except TransientChainError:
+                if attempt == self.max_retries:
+                    raise
+                self._counters[counter] += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+    async def _next_batch(self) -> List[Tuple[str, str, asyncio.Future]]:
+        """Wait for one item, then fill the batch until it is full or the delay expires."""
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_batch_delay
+        while len(batch) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _batch_loop(self):
+        """Turn queued items into transactions with consecutive local nonces."""
+        while True:
+            batch = await self._next_batch()
+            await self._slots.acquire()
+            self._in_flight += 1
+            task = asyncio.create_task(self._submit(self._take_nonce(), batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _take_nonce(self) -> Tuple[int, int]:
+        """Assign the next local nonce, tagged with the current resync generation."""
+        nonce = self._nonce
+        self._nonce += 1
+        return nonce, self._generation
+
+    def _is_stale(self, nonce: int, generation: int) -> bool:
+        """Whether a later resync restarted at or below ``nonce``, handing it to another batch."""
+        bases = self._resync_bases[generation + 1:]
+        return bool(bases) and min(bases) <= nonce
+
+    async def _resync(self, nonce: int, generation: int):
+        """
+        Recover from a nonce that never got a receipt.
+
+        If the nonce is still unused on-chain, later nonces can never be
+        mined, so local nonces restart from it and every batch holding a
+        higher nonce is reassigned. If the chain already used it, only this
+        batch is sent again.
+        """
+        if self._is_stale(nonce, generation):
+            raise _NonceReassigned()
+        try:
+            mined = await self._with_retries('poll_retries', self.chain.get_transaction_count, self.sender)
+        except Exception as e:
+            self._failure = e
+            raise
+        if self._is_stale(nonce, generation) or mined > nonce:
+            raise _NonceReassigned()
+        self._generation += 1
+        self._resync_bases.append(nonce)
+        self._nonce = nonce
+        self._counters['resyncs'] += 1
+
+    async def _submit(self, nonce: Tuple[int, int], batch: List[Tuple[str, str, asyncio.Future]]):
+        """Send one batch transaction and track it until confirmed, moving to a new nonce if needed."""
+        args = (tuple(item[0] for item in batch), tuple(item[1] for item in batch))
+        try:
+            for attempt in range(self.max_retries + 1):
+                if self._failure is not None:
+                    raise AnchorError("client stopped after its nonce could not be resynced")
+                try:
+                    receipt = await self._send_and_confirm(*nonce, args)
+                    break
+                except _NonceReassigned:
+                    self._counters['reassigned'] += 1
+                    nonce = self._take_nonce()
+            else:
+                raise AnchorError(f"batch reassigned {self.max_retries + 1} times without being mined")
+            if receipt['status'] != 1:
+                raise AnchorError(f"transaction {receipt['transaction_hash']} reverted")
+        except Exception as e:
+            self._counters['failed'] += len(batch)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e if isinstance(e, AnchorError) else AnchorError(str(e)))
+        else:
+            self._counters['anchored'] += len(batch)
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_result(receipt)
+        finally:
+            self._counters['transactions'] += 1
+            self._in_flight -= 1
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
+
+    async def _send_and_confirm(self, nonce: int, generation: int, args: Tuple) -> Dict[str, Any]:
+        """
+        Broadcast, wait a bounded time for enough confirmations, and rebroadcast on timeout.
+
+        A nonce only counts as burnt when no receipt was ever seen; a mined
+        transaction that stays short of ``confirmations`` used its nonce, so
+        it fails without disturbing later nonces.
+        """
+        loop = asyncio.get_running_loop()
+        receipt = None
+        try:
+            for attempt in range(self.max_retries + 1):
+                if receipt is None:
+                    if self._is_stale(nonce, generation):
+                        raise _NonceReassigned()
+                    tx_hash = await self._with_retries(
+                        'send_retries', self.chain.send_transaction, self.sender, nonce, 'issueCertificateBatch', args
+                    )
+                deadline = loop.time() + self.confirmation_timeout
+                while loop.time() < deadline:
+                    if receipt is None:
+                        receipt = await self._with_retries('poll_retries', self.chain.get_receipt, tx_hash)
+                    if receipt is not None:
+                        height = await self._with_retries('poll_retries', self.chain.block_number)
+                        if height - receipt['block_number'] + 1 >= self.confirmations:
+                            return receipt
+                    elif self._is_stale(nonce, generation):
+                        raise _NonceReassigned()
+                    await asyncio.sleep(self.poll_interval)
+                if receipt is None:
+                    self._counters['rebroadcasts'] += 1
+        except _NonceReassigned:
+            raise
+        except Exception:
+            if receipt is None:
+                await self._resync(nonce, generation)
+            raise
+        if receipt is None:
+            await self._resync(nonce, generation)
+            raise AnchorError(f"nonce {nonce} not mined after {self.max_retries} rebroadcasts")
+        raise AnchorError(f"transaction {receipt['transaction_hash']} mined but not confirmed "
+                          f"after {self.max_retries} rebroadcasts")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get client statistics.
+
+        Returns:
+            Dictionary with counters, queue depth and in-flight transactions
+        """
+        return {
+            **self._counters,
+            'queued': self._queue.qsize(),
+            'in_flight': self._in_flight,
+            'next_nonce': self._nonce
+        }
+
+
+async def benchmark_anchoring(n_certificates: int = 2000,
+                              chain: Optional[MockChain] = None,
+                              **client_kwargs) -> Dict[str, Any]:
+    """
+    Measure anchoring throughput against a mock chain.
+
+    Args:
+        n_certificates: Number of synthetic digests to anchor
+        chain: Mock chain to use (default: MockChain())
+        **client_kwargs: Options for AnchoringClient
+
+    Returns:
+        Dictionary with elapsed time, throughput and client statistics
+    """
+    chain = chain or MockChain()
+    digests = [hashlib.sha256(str(i).encode()).hexdigest() for i in range(n_certificates)]
+
+    start = time.perf_counter()
+    async with AnchoringClient(chain, chain.admin, **client_kwargs) as client:
+        await asyncio.gather(*[client.anchor(f'CERT-{i}', d) for i, d in enumerate(digests)])
+    elapsed = time.perf_counter() - start
+
+    return {
+        'certificates': n_certificates,
+        'elapsed_seconds': elapsed,
+        'certificates_per_second': n_certificates / elapsed,
+        'blocks_used': chain.n_blocks_with_txs,
+        'client': client.stats()
+    }
+
+
+if __name__ == "__main__":
+    print("=" * 70)
+    print("H-PCAE Anchoring Throughput (mock chain, 50 ms blocks)")
+    print("=" * 70)
+
+    sequential = asyncio.run(benchmark_anchoring(200, batch_size=1, max_in_flight=1))
+    pipelined = asyncio.run(benchmark_anchoring(20000, batch_size=200, max_in_flight=16))
+
+    print(f"Sequential (1 cert/tx, 1 in flight): {sequential['certificates_per_second']:>10,.0f} certs/s")
+    print(f"Pipelined  (200/tx, 16 in flight):   {pipelined['certificates_per_second']:>10,.0f} certs/s")
@@ -0,0 +1,279 @@
+"""
+H-PCAE Cache: Content-Addressed Result Cache
+============================================
+Avoids recomputing the H-PCAE pipeline for certificates that are verified
+repeatedly (QR re-scans, background-check polling).
+
+Tiers:
+1. Memory: in-process LRU bounded by bytes and TTL
+2. Disk (optional): SQLite store shared by all worker processes
+
+Entries are keyed by a BLAKE2b digest of the input row bytes plus the
+model version, so a refitted or reloaded model never serves stale hashes,
+and models of different versions can share one cache.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+
+# Approximate per-entry bookkeeping cost (key, tuple, OrderedDict node)
+_ENTRY_OVERHEAD = 128
+
+# Stay below SQLite's default limit on bound parameters per statement
+_SQL_BATCH = 900
+
+
+def row_digest(row: np.ndarray) -> bytes:
+    """
+    Fast content digest of one input row.
+
+    Args:
+        row: Contiguous input row
+
+    Returns:
+        16-byte BLAKE2b digest
+    """
+    return hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of compressed vectors and blockchain hashes.
+    """
+
+    def __init__(self,
+                 max_bytes: int = 64 * 1024 * 1024,
+                 ttl: Optional[float] = 3600.0,
+                 disk_path: Optional[str] = None):
+        """
+        Initialize result cache.
+
+        Args:
+            max_bytes: Memory tier size limit in bytes
+            ttl: Entry lifetime in seconds (None: never expire)
+            disk_path: SQLite file for the shared disk tier (None: memory only)
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.disk_path = disk_path
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0
+        }
+
+        self._db = None
+        if disk_path is not None:
+            self._db = sqlite3.connect(disk_path, timeout=30.0, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                ' version TEXT NOT NULL, key BLOB NOT NULL, dtype TEXT NOT NULL,'
+                ' vector BLOB NOT NULL, hash TEXT NOT NULL, created REAL NOT NULL,'
+                ' PRIMARY KEY (version, key))'
+            )
+            self._db.commit()
+
+    def _expired(self, created: float, now: float) -> bool:
+        """Check whether an entry created at ``created`` has outlived the TTL."""
+        return self.ttl is not None and now - created > self.ttl
+
+    def _store_memory(self, version: str, key: bytes, vector: np.ndarray, hash_value: str, created: float):
+        """Insert into the memory tier and evict least recently used entries."""
+        size = vector.nbytes + len(hash_value) + len(version) + len(key) + _ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop((version, key), None)
+        if old is not None:
+            self._bytes -= old[3]
+        # Copy so a cached row does not keep its whole input batch alive
+        self._entries[(version, key)] = (vector.copy(), hash_value, created, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted[3]
+            self._counters['evictions'] += 1
+
+    def get(self, version: str, key: bytes) -> Optional[Tuple[np.ndarray, str]]:
+        """
+        Look up one entry, memory tier first.
+
+        Args:
+            version: Model version
+            key: Row digest
+
+        Returns:
+            Tuple of (compressed vector, hash) or None on a miss
+        """
+        return self.get_many(version, [key])[0]
+
+    def get_many(self, version: str, keys: List[bytes]) -> List[Optional[Tuple[np.ndarray, str]]]:
+        """
+        Look up a batch of entries, memory tier first.
+
+        Memory misses are fetched from the disk tier with one query per
+        batch of up to ``_SQL_BATCH`` keys.
+
+        Args:
+            version: Model version
+            keys: Row digests
+
+        Returns:
+            List with a (compressed vector, hash) tuple or None per key
+        """
+        now = time.time()
+        results = [None] * len(keys)
+        with self._lock:
+            pending = {}
+            for i, key in enumerate(keys):
+                entry = self._entries.get((version, key))
+                if entry is not None:
+                    if not self._expired(entry[2], now):
+                        self._entries.move_to_end((version, key))
+                        self._counters['memory_hits'] += 1
+                        results[i] = entry[0], entry[1]
+                        continue
+                    del self._entries[(version, key)]
+                    self._bytes -= entry[3]
+                    self._counters['expirations'] += 1
+                pending.setdefault(key, []).append(i)
+
+            if self._db is not None and pending:
+                unique = list(pending)
+                for start in range(0, len(unique), _SQL_BATCH):
+                    batch = unique[start:start + _SQL_BATCH]
+                    rows = self._db.execute(
+                        'SELECT key, dtype, vector, hash, created FROM results'
+                        f' WHERE version = ? AND key IN ({",".join("?" * len(batch))})',
+                        (version, *batch)
+                    ).fetchall()
+                    for key, dtype, blob, hash_value, created in rows:
+                        if self._expired(created, now):
+                            self._counters['expirations'] += 1
+                            continue
+                        vector = np.frombuffer(blob, dtype=dtype)
+                        self._store_memory(version, key, vector, hash_value, created)
+                        for i in pending.pop(key):
+                            results[i] = vector, hash_value
+                            self._counters['disk_hits'] += 1
+
+            self._counters['misses'] += sum(len(indices) for indices in pending.values())
+            return results
+
+    def put_many(self, version: str, items: List[Tuple[bytes, np.ndarray, str]]):
+        """
+        Store computed results in both tiers.
+
+        Args:
+            version: Model version
+            items: List of (row digest, compressed vector, hash)
+        """
+        now = time.time()
+        with self._lock:
+            for key, vector, hash_value in items:
+                self._store_memory(version, key, vector, hash_value, now)
+            if self._db is not None:
+                self._db.executemany(
+                    'INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?)',
+                    [(version, key, vector.dtype.str, vector.tobytes(), hash_value, now)
+                     for key, vector, hash_value in items]
+                )
+                self._db.commit()
+
+    def process(self, model, X: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Cached equivalent of running ``X`` through ``model.transform`` and hashing.
+
+        Args:
+            model: Fitted HPCAE model
+            X: Input data (n_samples, n_features)
+
+        Returns:
+            List of blockchain records, one per row
+        """
+        version = model.model_version()
+        X = np.ascontiguousarray(X, dtype=model.dtype)
+        keys = [row_digest(row) for row in X]
+
+        results = [None] * len(keys)
+        missing = []
+        for i, entry in enumerate(self.get_many(version, keys)):
+            if entry is None:
+                missing.append(i)
+            else:
+                results[i] = model._blockchain_record(entry[0], entry[1])
+
+        if missing:
+            compressed = model.transform(X[missing])
+            items = []
+            for i, vector in zip(missing, compressed):
+                hash_value = model.get_blockchain_hash(vector)
+                items.append((keys[i], vector, hash_value))
+                results[i] = model._blockchain_record(vector, hash_value)
+            self.put_many(version, items)
+
+        return results
+
+    def purge_expired(self) -> int:
+        """
+        Remove expired entries from the disk tier.
+
+        Returns:
+            Number of removed rows
+        """
+        if self._db is None or self.ttl is None:
+            return 0
+        with self._lock:
+            cursor = self._db.execute('DELETE FROM results WHERE created < ?', (time.time() - self.ttl,))
+            self._db.commit()
+            return cursor.rowcount
+
+    def clear(self):
+        """Empty both tiers."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            if self._db is not None:
+                self._db.execute('DELETE FROM results')
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss counters and memory tier usage
+        """
+        with self._lock:
+            hits = self._counters['memory_hits'] + self._counters['disk_hits']
+            lookups = hits + self._counters['misses']
+            return {
+                **self._counters,
+                'hits': hits,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'memory_bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'model_versions': len({version for version, _ in self._entries}),
+                'disk_path': self.disk_path
+            }
+
+    def close(self):
+        """Close the disk tier connection."""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,345 @@
+"""
+H-PCAE Evaluation: Scalable Quality Metrics
+===========================================
+Measures how well a fitted H-PCAE model keeps certificates apart.
+
+Metrics:
+1. Reconstruction: Autoencoder MSE through ``decode``
+2. Neighbour preservation: k-NN overlap between input and compressed space
+3. Collisions: Nearest-neighbour distances of sampled rows and near-collision counts
+4. Hash collisions: Exact SHA-256 collision rate of blockchain hashes
+
+All metrics are computed in a single streaming pass over row chunks, so
+memory stays bounded by ``chunk_size`` and ``sample_size`` rather than by
+the number of rows: hash digests are spilled to disk in buckets keyed by
+their first byte and deduplicated one bucket at a time. Chunks are
+processed concurrently on a thread pool (NumPy releases the GIL inside
+BLAS calls), with BLAS limited to one thread per call while more than one
+worker runs, so workers do not oversubscribe the cores.
+"""
+
+import os
+import hashlib
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, Any, Tuple, Optional
+
+import numpy as np
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - threadpoolctl ships with scikit-learn
+    threadpool_limits = None
+
+
+# Digest buckets used to count exact hash collisions out of core
+_N_DIGEST_BUCKETS = 256
+
+
+def _forward(model, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run a chunk through all stages, keeping the intermediates needed for metrics.
+
+    Args:
+        model: Fitted HPCAE model
+        X: Input chunk (n_samples, n_features)
+
+    Returns:
+        Tuple of (scaled input, PCA output, latent representation, compressed output)
+    """
+    X = np.asarray(X, dtype=model.dtype)
+    X_scaled = model.scaler.transform(X)
+    X_pca = model._project_stage(X_scaled)
+    X_latent = model._encode_stage(X_pca)
+    X_final = model.entropy_selector.transform(X_latent)
+    return X_scaled, X_pca, X_latent, X_final
+
+
+class _DigestBuckets:
+    """
+    Out-of-core exact duplicate counter for 32-byte digests.
+
+    Digests are appended to one file per leading byte, so counting only ever
+    loads a single bucket (about 1/256 of all digests) into memory.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.n_digests = 0
+
+    def _path(self, bucket: int) -> str:
+        return os.path.join(self.directory, f'bucket-{bucket:03d}.bin')
+
+    def add(self, digests: np.ndarray):
+        """Append a batch of 'S32' digests to their buckets."""
+        self.n_digests += digests.shape[0]
+        leading = digests.view(np.uint8).reshape(-1, 32)[:, 0].astype(np.int64)
+        order = np.argsort(leading, kind='stable')
+        leading, digests = leading[order], digests[order]
+        bounds = np.searchsorted(leading, np.arange(_N_DIGEST_BUCKETS + 1))
+        for bucket in np.unique(leading):
+            with open(self._path(bucket), 'ab') as f:
+                digests[bounds[bucket]:bounds[bucket + 1]].tofile(f)
+
+    def count_unique(self) -> int:
+        """Number of distinct digests added so far."""
+        unique = 0
+        for bucket in range(_N_DIGEST_BUCKETS):
+            path = self._path(bucket)
+            if os.path.exists(path):
+                unique += np.unique(np.fromfile(path, dtype='S32')).shape[0]
+        return unique
+
+
+def _squared_distances(Q: np.ndarray, Q_norms: np.ndarray, R: np.ndarray) -> np.ndarray:
+    """
+    Blocked squared Euclidean distances between queries and a reference chunk.
+
+    Args:
+        Q: Query rows (n_queries, d)
+        Q_norms: Precomputed squared norms of Q (n_queries,)
+        R: Reference rows (n_refs, d)
+
+    Returns:
+        Squared distances (n_queries, n_refs), clipped at zero
+
+    The norm expansion cancels small distances, so candidates that matter
+    for collisions are re-measured with _exact_squared_distances.
+    """
+    D = -2.0 * (Q @ R.T)
+    D += Q_norms[:, None]
+    D += np.einsum('ij,ij->i', R, R)[None, :]
+    np.maximum(D, 0.0, out=D)
+    return D
+
+
+def _merge_topk(dist_a: np.ndarray, idx_a: np.ndarray,
+                dist_b: np.ndarray, idx_b: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Merge two per-query candidate lists and keep the k smallest distances.
+
+    Args:
+        dist_a, idx_a: First candidate distances and row indices (n_queries, k_a)
+        dist_b, idx_b: Second candidate distances and row indices (n_queries, k_b)
+        k: Number of neighbours to keep
+
+    Returns:
+        Tuple of (distances, indices), each (n_queries, k), sorted ascending
+    """
+    dist = np.concatenate([dist_a, dist_b], axis=1)
+    idx = np.concatenate([idx_a, idx_b], axis=1)
+    if dist.shape[1] > k:
+        part = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        dist = np.take_along_axis(dist, part, axis=1)
+        idx = np.take_along_axis(idx, part, axis=1)
+    order = np.argsort(dist, axis=1, kind='stable')
+    return np.take_along_axis(dist, order, axis=1), np.take_along_axis(idx, order, axis=1)
+
+
+def _exact_squared_distances(Q: np.ndarray, R: np.ndarray, idx: np.ndarray,
+                             candidate_dist: np.ndarray) -> np.ndarray:
+    """
+    Re-measure candidate neighbours by direct difference instead of norm expansion.
+
+    Args:
+        Q: Query rows (n_queries, d)
+        R: Reference rows of the chunk (n_refs, d)
+        idx: Local candidate indices into R (n_queries, k)
+        candidate_dist: Expanded distances of the candidates; inf marks excluded rows
+
+    Returns:
+        Exact squared distances (n_queries, k), keeping inf for excluded rows
+    """
+    diff = Q[:, None, :] - R[idx]
+    exact = np.einsum('ijk,ijk->ij', diff, diff)
+    return np.where(np.isinf(candidate_dist), np.inf, exact)
+
+
+def _block_topk(D: np.ndarray, offset: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the k nearest references of each query within one distance block.
+
+    Args:
+        D: Squared distances (n_queries, n_refs)
+        offset: Global row index of the first reference in the block
+        k: Number of neighbours to keep
+
+    Returns:
+        Tuple of (distances, global row indices), each (n_queries, min(k, n_refs))
+    """
+    k_block = min(k, D.shape[1])
+    part = np.argpartition(D, k_block - 1, axis=1)[:, :k_block]
+    return np.take_along_axis(D, part, axis=1), part + offset
+
+
+def _evaluate_chunk(model, X_chunk: np.ndarray, offset: int, query_index: np.ndarray,
+                    Q_in: np.ndarray, Q_in_norms: np.ndarray,
+                    Q_out: np.ndarray, Q_out_norms: np.ndarray,
+                    n_neighbors: int) -> Dict[str, Any]:
+    """
+    Compute partial metrics for one chunk of rows.
+
+    Args:
+        model: Fitted HPCAE model
+        X_chunk: Input rows of this chunk
+        offset: Global row index of the first row in the chunk
+        query_index: Global row indices of the sampled queries
+        Q_in, Q_in_norms: Queries in scaled input space and their squared norms
+        Q_out, Q_out_norms: Queries in compressed space and their squared norms
+        n_neighbors: Number of neighbours (k) to track
+
+    Returns:
+        Dictionary of partial sums, candidate neighbours and hash digests
+    """
+    X_scaled, X_pca, X_latent, X_final = _forward(model, X_chunk)
+    X_recon = model.autoencoder.decode(X_latent)
+    sq_error = float(np.sum((X_pca - X_recon) ** 2))
+
+    # Compressed space is low-dimensional, so distances there are cheap to
+    # take in float64, where near-collisions must not be lost to rounding
+    X_out = X_final.astype(np.float64)
+    D_in = _squared_distances(Q_in, Q_in_norms, X_scaled)
+    D_out = _squared_distances(Q_out, Q_out_norms, X_out)
+
+    # A query must not count itself as its own neighbour
+    local = query_index - offset
+    mask = (local >= 0) & (local < X_chunk.shape[0])
+    rows = np.nonzero(mask)[0]
+    D_in[rows, local[mask]] = np.inf
+    D_out[rows, local[mask]] = np.inf
+
+    in_dist, in_idx = _block_topk(D_in, offset, n_neighbors)
+    out_dist, out_idx = _block_topk(D_out, offset, n_neighbors)
+    out_dist = _exact_squared_distances(Q_out, X_out, out_idx - offset, out_dist)
+
+    digests = np.empty(X_final.shape[0], dtype='S32')
+    for i in range(X_final.shape[0]):
+        digests[i] = hashlib.sha256(X_final[i].astype(np.float32, copy=False).tobytes()).digest()
+
+    return {
+        'sq_error': sq_error,
+        'n_values': X_pca.size,
+        'in_dist': in_dist, 'in_idx': in_idx,
+        'out_dist': out_dist, 'out_idx': out_idx,
+        'digests': digests,
+    }
+
+
+def evaluate_hpcae(model, X: np.ndarray,
+                   n_neighbors: int = 10,
+                   sample_size: int = 1000,
+                   chunk_size: int = 4096,
+                   collision_radius: float = 1e-3,
+                   n_jobs: Optional[int] = None,
+                   random_state: int = 0,
+                   spill_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Evaluate a fitted H-PCAE model over a (possibly memory-mapped) dataset.
+
+    Neighbour and distance metrics are computed for ``sample_size`` sampled
+    query rows against every row of ``X``; they are exact when
+    ``sample_size >= len(X)``. Reconstruction error and the hash collision
+    rate always cover every row.
+
+    Args:
+        model: Fitted HPCAE model
+        X: Evaluation data (n_samples, n_features), e.g. a ``np.memmap``
+        n_neighbors: Number of neighbours (k) for neighbour preservation
+        sample_size: Number of sampled query rows for distance metrics
+        chunk_size: Rows per chunk; bounds memory per worker
+        collision_radius: Compressed-space distance that counts as a near-collision
+        n_jobs: Worker threads (default: number of CPU cores). With more than
+            one worker, BLAS is limited to one thread per call for the whole
+            process while the evaluation runs. Hashing holds the GIL, so only
+            the matrix work scales with n_jobs.
+        random_state: Seed for query sampling
+        spill_dir: Directory for temporary digest buckets (default: system temp)
+
+    Returns:
+        Dictionary with reconstruction, neighbour and collision metrics
+    """
+    if not model.is_fitted:
+        raise ValueError("Model must be fitted before evaluation")
+
+    n_samples = X.shape[0]
+    if n_samples < 2:
+        raise ValueError("Evaluation requires at least 2 samples")
+    n_neighbors = min(n_neighbors, n_samples - 1)
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    rng = np.random.default_rng(random_state)
+    query_index = np.sort(rng.choice(n_samples, size=min(sample_size, n_samples), replace=False))
+    Q_in, _, _, Q_out = _forward(model, X[query_index])
+    Q_out = Q_out.astype(np.float64)
+    Q_in_norms = np.einsum('ij,ij->i', Q_in, Q_in)
+    Q_out_norms = np.einsum('ij,ij->i', Q_out, Q_out)
+
+    n_queries = query_index.shape[0]
+    in_dist = np.empty((n_queries, 0), dtype=model.dtype)
+    in_idx = np.empty((n_queries, 0), dtype=np.int64)
+    out_dist = np.empty((n_queries, 0))
+    out_idx = np.empty((n_queries, 0), dtype=np.int64)
+    spill = tempfile.TemporaryDirectory(prefix='hpcae-digests-', dir=spill_dir)
+    buckets = _DigestBuckets(spill.name)
+    sq_error = 0.0
+    n_values = 0
+
+    def merge(part: Dict[str, Any]):
+        nonlocal in_dist, in_idx, out_dist, out_idx, sq_error, n_values
+        sq_error += part['sq_error']
+        n_values += part['n_values']
+        in_dist, in_idx = _merge_topk(in_dist, in_idx, part['in_dist'], part['in_idx'], n_neighbors)
+        out_dist, out_idx = _merge_topk(out_dist, out_idx, part['out_dist'], part['out_idx'], n_neighbors)
+        buckets.add(part['digests'])
+
+    # Workers already occupy the cores, so each BLAS call gets a single thread
+    if n_jobs > 1 and threadpool_limits is not None:
+        blas_limits = threadpool_limits(limits=1, user_api='blas')
+    else:
+        blas_limits = nullcontext()
+
+    # Keep at most 2 * n_jobs chunks in flight so memory stays bounded
+    with spill, blas_limits, ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        pending = []
+        for offset in range(0, n_samples, chunk_size):
+            pending.append(executor.submit(
+                _evaluate_chunk, model, X[offset:offset + chunk_size], offset, query_index,
+                Q_in, Q_in_norms, Q_out, Q_out_norms, n_neighbors
+            ))
+            if len(pending) >= 2 * n_jobs:
+                merge(pending.pop(0).result())
+        for future in pending:
+            merge(future.result())
+        unique_hashes = buckets.count_unique()
+
+    overlap = np.array([
+        np.intersect1d(in_idx[i], out_idx[i]).size for i in range(n_queries)
+    ]) / n_neighbors
+    nearest = np.sqrt(out_dist[:, 0])
+    near_collisions = int(np.sum(nearest <= collision_radius))
+
+    return {
+        'reconstruction': {
+            'mse': sq_error / n_values,
+            'n_samples': n_samples
+        },
+        'neighbour_preservation': {
+            'k': n_neighbors,
+            'mean_overlap': float(np.mean(overlap)),
+            'min_overlap': float(np.min(overlap)),
+            'n_queries': n_queries
+        },
+        'collisions': {
+            'min_sampled_nearest_distance': float(np.min(nearest)),
+            'mean_nearest_distance': float(np.mean(nearest)),
+            'collision_radius': collision_radius,
+            'near_collisions': near_collisions,
+            'near_collision_rate': near_collisions / n_queries
+        },
+        'hash_collisions': {
+            'unique_hashes': unique_hashes,
+            'colliding_rows': n_samples - unique_hashes,
+            'collision_rate': (n_samples - unique_hashes) / n_samples
+        }
+    }
@@ -0,0 +1,280 @@
+"""
+H-PCAE Planner: Adaptive Execution Planning
+===========================================
+Auto-tunes how a fitted H-PCAE model executes on the current host.
+
+On the first large ``transform`` call a short micro-benchmark over the
+model's real shapes picks the BLAS thread limit of each stage (via
+threadpoolctl, when available). Every matrix multiply already runs on
+fixed ROW_BLOCK-row blocks, so there is no batch shape left to tune; the
+plan's chunk size only bounds the temporaries of one stage call.
+
+Plans are cached per host fingerprint and model signature, so reloading
+the same model on the same host skips calibration.
+
+BLAS thread limits are process-wide. Planned transforms hold a lock while
+their limits are active, so concurrent planned calls run one at a time;
+BLAS calls from other threads (unplanned transforms, evaluation) run under
+the active limits meanwhile.
+"""
+
+import os
+import json
+import time
+import hashlib
+import platform
+import threading
+from contextlib import nullcontext
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
+
+from h_pcae_algorithm import ROW_BLOCK
+
+try:
+    from threadpoolctl import threadpool_limits
+except ImportError:  # pragma: no cover - threadpoolctl ships with scikit-learn
+    threadpool_limits = None
+
+
+PLAN_CACHE_PATH = os.environ.get(
+    'HPCAE_PLAN_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'h_pcae', 'execution_plans.json')
+)
+
+# Smallest transform that is calibrated for and run under the plan; below it,
+# entering the thread limits costs more than it can save
+PLANNED_MIN_ROWS = 4096
+
+# Default memory budget for the temporaries of one stage call
+CHUNK_BYTES = 64 * 1024 * 1024
+
+_LIMITS_LOCK = threading.Lock()
+
+
+def host_fingerprint() -> str:
+    """
+    Identify the host's performance-relevant configuration.
+
+    Returns:
+        16-character hex fingerprint of CPU, core count, OS and NumPy/BLAS build
+    """
+    cpu = platform.processor()
+    try:
+        with open('/proc/cpuinfo') as f:
+            cpu = next((line.split(':', 1)[1].strip() for line in f if line.startswith('model name')), cpu)
+    except OSError:
+        pass
+    blas = ''
+    if threadpool_limits is not None:
+        from threadpoolctl import threadpool_info
+        blas = ','.join(sorted(f"{i.get('internal_api')}:{i.get('version')}" for i in threadpool_info()))
+    parts = [platform.machine(), platform.system(), cpu, str(os.cpu_count()), np.__version__, blas]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()[:16]
+
+
+def model_signature(model) -> str:
+    """
+    Describe the shapes and precision that determine a model's performance.
+
+    Args:
+        model: Fitted HPCAE model
+
+    Returns:
+        Signature string, e.g. ``256-128-[128, 64]-64-32-float64``
+    """
+    return (f"{model.scaler.n_features_in_}-{model.pca_components}-{model.autoencoder.hidden_dims}-"
+            f"{model.latent_dim}-{model.entropy_features}-{model.dtype.name}")
+
+
+def _limits(threads: Optional[int]):
+    """BLAS thread limit context, or a no-op when it cannot be controlled."""
+    if threads is None or threadpool_limits is None:
+        return nullcontext()
+    return threadpool_limits(limits=threads, user_api='blas')
+
+
+def _thread_candidates() -> list:
+    """Powers of two up to the core count, plus the core count itself."""
+    n_cpus = os.cpu_count() or 1
+    candidates = {n_cpus}
+    t = 1
+    while t < n_cpus:
+        candidates.add(t)
+        t *= 2
+    return sorted(candidates)
+
+
+def _best_time(fn, repeats: int) -> float:
+    """Fastest of ``repeats`` timed calls."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def chunk_rows(model, chunk_bytes: int = CHUNK_BYTES) -> int:
+    """
+    Rows per stage call that keep the call's temporaries within a memory budget.
+
+    A call holds about two arrays (input copy and output) per layer width,
+    so the budget is split over twice the sum of all stage widths.
+
+    Args:
+        model: Fitted HPCAE model
+        chunk_bytes: Memory budget for one stage call
+
+    Returns:
+        Chunk size in rows, a positive multiple of ROW_BLOCK
+    """
+    widths = ([model.scaler.n_features_in_, model.pca_components]
+              + list(model.autoencoder.hidden_dims) + [model.latent_dim])
+    rows = chunk_bytes // (2 * sum(widths) * model.dtype.itemsize)
+    return max(ROW_BLOCK, rows // ROW_BLOCK * ROW_BLOCK)
+
+
+def planned_transform(model, X: np.ndarray, plan: Dict[str, Any]) -> np.ndarray:
+    """
+    Run ``X`` through all stages under the planned thread limits.
+
+    Each stage runs over all chunks under its own limit, which is entered
+    once per call. Chunks are whole ROW_BLOCKs and go through the same
+    fixed-shape row blocks as ``HPCAE.transform``, so the output is
+    identical to the unplanned path. Peak memory is the full PCA and
+    latent outputs plus one chunk's temporaries.
+
+    Args:
+        model: Fitted HPCAE model
+        X: Input data already in the model dtype (n_samples, n_features)
+        plan: Execution plan
+
+    Returns:
+        Compressed representation (n_samples, entropy_features)
+    """
+    chunk_size = -(-plan['chunk_size'] // ROW_BLOCK) * ROW_BLOCK
+    n_samples = X.shape[0]
+    X_pca = np.empty((n_samples, model.pca_components), dtype=model.dtype)
+    X_latent = np.empty((n_samples, model.latent_dim), dtype=model.dtype)
+
+    # threadpool_limits applies on construction, so build one per stage
+    with _LIMITS_LOCK:
+        with _limits(plan['stages']['pca']['threads']):
+            for start in range(0, n_samples, chunk_size):
+                X_pca[start:start + chunk_size] = model._pca_stage(X[start:start + chunk_size])
+        with _limits(plan['stages']['autoencoder']['threads']):
+            for start in range(0, n_samples, chunk_size):
+                X_latent[start:start + chunk_size] = model._encode_stage(X_pca[start:start + chunk_size])
+    return model.entropy_selector.transform(X_latent)
+
+
+def calibrate(model,
+              thread_candidates: Optional[Sequence[int]] = None,
+              chunk_bytes: int = CHUNK_BYTES,
+              n_rows: Optional[int] = None,
+              repeats: int = 3,
+              random_state: int = 0) -> Dict[str, Any]:
+    """
+    Micro-benchmark a fitted model and choose its execution plan.
+
+    Args:
+        model: Fitted HPCAE model
+        thread_candidates: BLAS thread limits to try (default: powers of two up to the core count)
+        chunk_bytes: Memory budget for the temporaries of one stage call
+        n_rows: Rows of synthetic calibration input (default: PLANNED_MIN_ROWS)
+        repeats: Timed repetitions per configuration (fastest wins)
+        random_state: Seed for the synthetic calibration input
+
+    Returns:
+        Execution plan dictionary
+    """
+    start = time.perf_counter()
+    if threadpool_limits is None:
+        thread_candidates = [None]
+    else:
+        thread_candidates = list(thread_candidates or _thread_candidates())
+
+    rng = np.random.default_rng(random_state)
+    n_rows = n_rows or PLANNED_MIN_ROWS
+    X = rng.standard_normal((n_rows, model.scaler.n_features_in_)).astype(model.dtype)
+    X_pca = model._pca_stage(X)
+
+    runs = {
+        'pca': (lambda: model._pca_stage(X)),
+        'autoencoder': (lambda: model._encode_stage(X_pca)),
+    }
+    stages = {}
+    for stage, run in runs.items():
+        timings = {}
+        for threads in thread_candidates:
+            with _limits(threads):
+                timings[threads] = _best_time(run, repeats)
+        threads = min(timings, key=timings.get)
+        stages[stage] = {
+            'threads': threads,
+            'rows_per_second': n_rows / timings[threads]
+        }
+
+    plan = {'chunk_size': chunk_rows(model, chunk_bytes), 'chunk_bytes': chunk_bytes, 'stages': stages}
+    plan.update({
+        'rows_per_second': n_rows / _best_time(lambda: planned_transform(model, X, plan), repeats),
+        'host': host_fingerprint(),
+        'signature': model_signature(model),
+        'calibration_seconds': time.perf_counter() - start,
+        'calibrated_at': time.time()
+    })
+    return plan
+
+
+def _load_plans(path: str) -> Dict[str, Any]:
+    """Read the plan cache, treating a missing or corrupt file as empty."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_plan(path: str, key: str, plan: Dict[str, Any]):
+    """Add a plan to the cache file; failures only cost a recalibration later."""
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        plans = _load_plans(path)
+        plans[key] = plan
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(plans, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def plan_execution(model, cache_path: Optional[str] = None, force: bool = False, **kwargs) -> Dict[str, Any]:
+    """
+    Get the execution plan for a model on this host, calibrating on a cache miss.
+
+    Args:
+        model: Fitted HPCAE model
+        cache_path: Plan cache file (default: PLAN_CACHE_PATH)
+        force: Recalibrate even if a cached plan exists
+        **kwargs: Options forwarded to calibrate()
+
+    Returns:
+        Execution plan dictionary, with 'source' set to 'cache' or 'calibrated'
+    """
+    cache_path = cache_path or PLAN_CACHE_PATH
+    key = f'{host_fingerprint()}:{model_signature(model)}'
+
+    plan = None if force else _load_plans(cache_path).get(key)
+    if plan is not None and 'chunk_bytes' not in plan:
+        # Written by an older planner that tuned chunk size and weight layout
+        plan = None
+    if plan is not None:
+        plan['source'] = 'cache'
+    else:
+        plan = calibrate(model, **kwargs)
+        _save_plan(cache_path, key, plan)
+        plan['source'] = 'calibrated'
+
+    return plan
@@ -0,0 +1,239 @@
+"""
+H-PCAE Workload: Synthetic Data for Load and Capacity Testing
+=============================================================
+Generates realistic student credential feature matrices with tens of
+millions of rows without holding them in memory.
+
+Features:
+1. Chunked output: ``.npy`` memmaps or Parquet part files
+2. Reproducible parallelism: each chunk draws from its own counter-based
+   (Philox) stream, so chunks can be generated in any order by any worker
+3. Configurable structure: dimensionality, latent factors, paired feature
+   correlations and duplicate / near-duplicate rates
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional, Tuple, Any
+
+import numpy as np
+
+
+class SyntheticWorkload:
+    """
+    Deterministic, chunked synthetic credential workload.
+
+    Row ``i`` of the dataset only depends on ``seed`` and the chunk that
+    contains it, so the output is identical regardless of ``n_jobs``.
+    """
+
+    def __init__(self,
+                 n_samples: int,
+                 n_features: int = 256,
+                 chunk_size: int = 65536,
+                 n_factors: int = 0,
+                 factor_strength: float = 1.0,
+                 correlation_stride: int = 10,
+                 correlation_strength: float = 0.8,
+                 correlation_noise: float = 0.2,
+                 duplicate_rate: float = 0.0,
+                 near_duplicate_rate: float = 0.0,
+                 near_duplicate_noise: float = 1e-3,
+                 dtype: Any = np.float32,
+                 seed: int = 42):
+        """
+        Initialize workload.
+
+        Args:
+            n_samples: Total number of student records
+            n_features: Number of features per record
+            chunk_size: Rows per chunk (unit of parallel work)
+            n_factors: Number of shared latent factors (0 disables)
+            factor_strength: Scale of the latent factor loadings
+            correlation_stride: Every ``stride``-th feature drives the next one (0 disables;
+                1 chains every feature to its predecessor)
+            correlation_strength: Weight of the driving feature
+            correlation_noise: Noise scale of the driven feature
+            duplicate_rate: Fraction of rows that exactly copy another row
+            near_duplicate_rate: Fraction of rows that copy another row plus noise
+            near_duplicate_noise: Noise scale of near-duplicates
+            dtype: Output dtype
+            seed: Root seed for all chunk streams
+        """
+        if np.dtype(dtype) not in (np.dtype(np.float32), np.dtype(np.float64)):
+            raise ValueError(f"dtype must be float32 or float64, got {np.dtype(dtype)}")
+        if duplicate_rate + near_duplicate_rate >= 1.0:
+            raise ValueError("duplicate_rate + near_duplicate_rate must be below 1")
+
+        self.n_samples = n_samples
+        self.n_features = n_features
+        self.chunk_size = chunk_size
+        self.n_factors = n_factors
+        self.factor_strength = factor_strength
+        self.correlation_stride = correlation_stride
+        self.correlation_strength = correlation_strength
+        self.correlation_noise = correlation_noise
+        self.duplicate_rate = duplicate_rate
+        self.near_duplicate_rate = near_duplicate_rate
+        self.near_duplicate_noise = near_duplicate_noise
+        self.dtype = np.dtype(dtype)
+        self.seed = seed
+
+        # Loadings are shared by every chunk, so they come from a dedicated stream
+        self.loadings = None
+        if n_factors > 0:
+            rng = np.random.Generator(np.random.Philox(np.random.SeedSequence(seed, spawn_key=(2**32,))))
+            self.loadings = (rng.standard_normal((n_factors, n_features))
+                             * (factor_strength / np.sqrt(n_factors))).astype(self.dtype)
+
+    @property
+    def n_chunks(self) -> int:
+        """Number of chunks in the workload."""
+        return -(-self.n_samples // self.chunk_size)
+
+    def chunk_bounds(self, index: int) -> Tuple[int, int]:
+        """
+        Row range of a chunk.
+
+        Args:
+            index: Chunk index
+
+        Returns:
+            Tuple of (start, stop) global row indices
+        """
+        start = index * self.chunk_size
+        return start, min(start + self.chunk_size, self.n_samples)
+
+    def _rng(self, index: int) -> np.random.Generator:
+        """Independent counter-based generator for one chunk."""
+        return np.random.Generator(np.random.Philox(np.random.SeedSequence(self.seed, spawn_key=(index,))))
+
+    def generate_chunk(self, index: int, return_sources: bool = False):
+        """
+        Generate one chunk of the workload.
+
+        Duplicates and near-duplicates copy a non-duplicate row of the same
+        chunk, so every chunk stays independently generatable.
+
+        Args:
+            index: Chunk index
+            return_sources: Also return the global row each row was copied from
+
+        Returns:
+            Chunk data (n_rows, n_features), and if requested a source array
+            with the global source row index or -1 for original rows
+        """
+        start, stop = self.chunk_bounds(index)
+        n_rows = stop - start
+        rng = self._rng(index)
+
+        data = rng.standard_normal((n_rows, self.n_features), dtype=self.dtype)
+
+        if self.loadings is not None:
+            data += rng.standard_normal((n_rows, self.n_factors), dtype=data.dtype) @ self.loadings
+
+        if self.correlation_stride > 0:
+            src = np.arange(0, self.n_features - 1, self.correlation_stride)
+            noise = rng.standard_normal((n_rows, src.size), dtype=data.dtype) * self.correlation_noise
+            if self.correlation_stride == 1:
+                # Each driven feature drives the next one, so build the chain in order
+                for j in src:
+                    data[:, j + 1] = data[:, j] * self.correlation_strength + noise[:, j]
+            else:
+                data[:, src + 1] = data[:, src] * self.correlation_strength + noise
+
+        sources = np.full(n_rows, -1, dtype=np.int64)
+        n_dup = int(round(n_rows * self.duplicate_rate))
+        n_near = int(round(n_rows * self.near_duplicate_rate))
+        # Rounding can use up small tail chunks; keep at least one original
+        n_dup = min(n_dup, n_rows - 1)
+        n_near = min(n_near, n_rows - 1 - n_dup)
+        if n_dup + n_near > 0:
+            order = rng.permutation(n_rows)
+            copies, originals = order[:n_dup + n_near], order[n_dup + n_near:]
+            picked = originals[rng.integers(0, originals.size, size=copies.size)]
+            data[copies] = data[picked]
+            near = copies[n_dup:]
+            data[near] += rng.standard_normal((near.size, self.n_features), dtype=data.dtype) * self.near_duplicate_noise
+            sources[copies] = picked + start
+
+        return (data, sources) if return_sources else data
+
+    def iter_chunks(self) -> Iterator[np.ndarray]:
+        """
+        Yield all chunks in order.
+
+        Yields:
+            Chunk data (n_rows, n_features)
+        """
+        for index in range(self.n_chunks):
+            yield self.generate_chunk(index)
+
+    def _run(self, fn, args_list, n_jobs: Optional[int]):
+        """Run chunk jobs inline or on a process pool."""
+        n_jobs = n_jobs or os.cpu_count() or 1
+        if n_jobs == 1:
+            for args in args_list:
+                fn(*args)
+            return
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            for future in [executor.submit(fn, *args) for args in args_list]:
+                future.result()
+
+    def write_npy(self, path: str, n_jobs: Optional[int] = None) -> np.memmap:
+        """
+        Write the workload to a ``.npy`` file in parallel.
+
+        Args:
+            path: Output ``.npy`` path
+            n_jobs: Worker processes (default: number of CPU cores)
+
+        Returns:
+            Read-only memmap of the written file
+        """
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=self.dtype,
+                                        shape=(self.n_samples, self.n_features))
+        del out
+        self._run(_write_npy_chunk, [(self, path, i) for i in range(self.n_chunks)], n_jobs)
+        return np.load(path, mmap_mode='r')
+
+    def write_parquet(self, directory: str, n_jobs: Optional[int] = None) -> list:
+        """
+        Write the workload as one Parquet part file per chunk, in parallel.
+
+        Requires the optional ``pyarrow`` dependency.
+
+        Args:
+            directory: Output directory (created if missing)
+            n_jobs: Worker processes (default: number of CPU cores)
+
+        Returns:
+            List of written part file paths, in row order
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as e:
+            raise ImportError("write_parquet requires pyarrow: pip install pyarrow") from e
+
+        os.makedirs(directory, exist_ok=True)
+        paths = [os.path.join(directory, f'part-{i:05d}.parquet') for i in range(self.n_chunks)]
+        self._run(_write_parquet_chunk, [(self, p, i) for i, p in enumerate(paths)], n_jobs)
+        return paths
+
+
+def _write_npy_chunk(workload: SyntheticWorkload, path: str, index: int):
+    """Generate one chunk and write it into its slice of the ``.npy`` file."""
+    start, stop = workload.chunk_bounds(index)
+    out = np.load(path, mmap_mode='r+')
+    out[start:stop] = workload.generate_chunk(index)
+    out.flush()
+
+
+def _write_parquet_chunk(workload: SyntheticWorkload, path: str, index: int):
+    """Generate one chunk and write it as a Parquet part file."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    data = workload.generate_chunk(index)
+    table = pa.table({f'f{j}': data[:, j] for j in range(data.shape[1])})
+    pq.write_table(table, path)
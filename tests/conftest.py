@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from h_pcae_algorithm import HPCAE, create_sample_student_data  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def plan_cache(tmp_path, monkeypatch):
+    """Keep execution plans out of the user's home directory."""
+    import h_pcae_planner
+    path = str(tmp_path / 'plans.json')
+    monkeypatch.setattr(h_pcae_planner, 'PLAN_CACHE_PATH', path)
+    return path
+
+
+@pytest.fixture
+def data():
+    return create_sample_student_data(n_samples=600, n_features=64)
+
+
+def fit_model(X, dtype=np.float64, **kwargs):
+    kwargs.setdefault('auto_plan', False)
+    np.random.seed(0)
+    model = HPCAE(pca_components=32, latent_dim=16, entropy_features=8, dtype=dtype, **kwargs)
+    return model.fit(X, ae_epochs=3, verbose=False)
+
+
+@pytest.fixture(params=[np.float64, np.float32], ids=['float64', 'float32'])
+def model(request, data):
+    return fit_model(data, dtype=request.param)
@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+
+from h_pcae_anchor import AnchorError, AnchoringClient, MockChain, TransientChainError, benchmark_anchoring
+
+
+class LosingChain(MockChain):
+    """Mock chain that loses every transaction carrying a given certificate."""
+
+    def __init__(self, lost_cert, mode='drop', **kwargs):
+        super().__init__(**kwargs)
+        self.lost_cert = lost_cert
+        self.mode = mode
+
+    async def send_transaction(self, sender, nonce, method, args):
+        if self.lost_cert in args[0]:
+            await self._rpc()
+            if self.mode == 'error':
+                raise TransientChainError("mock send failure")
+            return '0xlost'
+        return await super().send_transaction(sender, nonce, method, args)
+
+
+class StalledChain(MockChain):
+    """Mock chain whose reported height stops moving while ``stalled`` is set."""
+
+    stalled = True
+
+    async def block_number(self):
+        height = await super().block_number()
+        return min(height, 1) if self.stalled else height
+
+
+class FlakyReceiptChain(MockChain):
+    """Mock chain whose sends always succeed but whose receipt polls often fail."""
+
+    async def get_receipt(self, tx_hash):
+        if self._rng.random() < 0.3:
+            raise TransientChainError("mock poll failure")
+        return await super().get_receipt(tx_hash)
+
+
+def test_anchors_everything_despite_failures_and_drops():
+    chain = MockChain(block_time=0.01, failure_rate=0.1, drop_rate=0.2, seed=3)
+
+    result = asyncio.run(benchmark_anchoring(
+        300, chain=chain, batch_size=20, max_in_flight=4, max_retries=8,
+        retry_backoff=0.001, confirmation_timeout=0.1, poll_interval=0.005
+    ))
+
+    stats = result['client']
+    assert stats['anchored'] == 300
+    assert stats['failed'] == 0
+    assert stats['rebroadcasts'] > 0
+    assert stats['send_retries'] + stats['poll_retries'] > 0
+    assert all(chain.verify_certificate(f'CERT-{i}')[1] for i in range(300))
+
+
+def test_poll_failures_are_not_counted_as_send_retries():
+    chain = FlakyReceiptChain(block_time=0.01, seed=1)
+
+    result = asyncio.run(benchmark_anchoring(50, chain=chain, batch_size=10, max_retries=8,
+                                             retry_backoff=0.001, poll_interval=0.005))
+
+    assert result['client']['send_retries'] == 0
+    assert result['client']['poll_retries'] > 0
+
+
+def test_batching_reduces_transactions():
+    result = asyncio.run(benchmark_anchoring(200, chain=MockChain(block_time=0.01), batch_size=50))
+
+    assert result['client']['anchored'] == 200
+    assert result['client']['transactions'] <= 8
+
+
+def test_revert_raises_without_stopping_the_client():
+    async def run():
+        chain = MockChain(block_time=0.01)
+        async with AnchoringClient(chain, '0xnot-admin', poll_interval=0.005) as client:
+            with pytest.raises(AnchorError, match='reverted'):
+                await client.anchor('CERT-1', 'abc')
+            return client._failure
+
+    assert asyncio.run(run()) is None
+
+
+def test_confirmation_wait_is_bounded_and_does_not_burn_the_nonce():
+    async def run():
+        chain = StalledChain(block_time=0.01)
+        async with AnchoringClient(chain, chain.admin, confirmations=3, max_retries=1,
+                                   confirmation_timeout=0.05, poll_interval=0.005) as client:
+            with pytest.raises(AnchorError, match='mined but not confirmed'):
+                await client.anchor('CERT-1', 'abc')
+            chain.stalled = False
+            receipt = await client.anchor('CERT-2', 'def')
+            return receipt, client.stats()
+
+    receipt, stats = asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert receipt['nonce'] == 1
+    assert stats['resyncs'] == 0
+    assert stats['rebroadcasts'] == 0
+
+
+@pytest.mark.parametrize('mode', ['drop', 'error'])
+def test_burnt_nonce_is_resynced_and_later_batches_reassigned(mode):
+    async def run():
+        chain = LosingChain('CERT-0', mode=mode, block_time=0.01)
+        async with AnchoringClient(chain, chain.admin, batch_size=1, max_batch_delay=0.0, max_retries=1,
+                                   retry_backoff=0.001, confirmation_timeout=0.1,
+                                   poll_interval=0.005) as client:
+            lost = asyncio.ensure_future(client.anchor('CERT-0', 'abc'))
+            await asyncio.sleep(0.02)
+            pending = asyncio.gather(*[client.anchor(f'CERT-{i}', 'def') for i in range(1, 4)])
+            with pytest.raises(AnchorError):
+                await lost
+            receipts = await pending
+            receipts.append(await client.anchor('CERT-4', 'ghi'))
+            return chain, receipts, client.stats(), client._failure
+
+    chain, receipts, stats, failure = asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert failure is None
+    assert len({r['nonce'] for r in receipts}) == 4
+    assert all(chain.verify_certificate(f'CERT-{i}')[1] for i in range(1, 5))
+    assert not chain.verify_certificate('CERT-0')[1]
+    assert stats['resyncs'] == 1
+    assert stats['failed'] == 1
+    if mode == 'drop':
+        # Batches sent behind the lost nonce move to new nonces
+        assert stats['reassigned'] >= 3
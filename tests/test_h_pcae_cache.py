@@ -0,0 +1,90 @@
+import time
+
+import numpy as np
+
+from conftest import fit_model
+from h_pcae_cache import ResultCache
+
+
+def test_cached_results_match_uncached(model, data):
+    expected = model.process_for_blockchain(data[:50])
+    cache = model.enable_cache()
+
+    first = model.process_for_blockchain(data[:50])
+    second = model.process_for_blockchain(data[:50])
+
+    assert first == expected
+    assert second == expected
+    stats = cache.stats()
+    assert stats['misses'] == 50
+    assert stats['memory_hits'] == 50
+
+
+def test_memory_tier_enforces_byte_limit(data):
+    model = fit_model(data)
+    cache = model.enable_cache(max_bytes=20_000)
+
+    model.process_for_blockchain(data)
+
+    entries = list(cache._entries.values())
+    assert entries
+    assert all(vector.base is None for vector, *_ in entries)
+    assert sum(vector.nbytes for vector, *_ in entries) <= cache.max_bytes
+    assert cache.stats()['memory_bytes'] <= cache.max_bytes
+    assert cache.stats()['evictions'] > 0
+
+
+def test_models_of_different_versions_share_a_cache(data):
+    first = fit_model(data)
+    second = fit_model(data[::-1])
+    assert first.model_version() != second.model_version()
+    cache = ResultCache()
+    first.enable_cache(cache)
+    second.enable_cache(cache)
+
+    first.process_for_blockchain(data[:20])
+    second.process_for_blockchain(data[:20])
+    first.process_for_blockchain(data[:20])
+    second.process_for_blockchain(data[:20])
+
+    stats = cache.stats()
+    assert stats['misses'] == 40
+    assert stats['memory_hits'] == 40
+    assert stats['model_versions'] == 2
+
+
+def test_disk_tier_is_shared_between_caches(model, data, tmp_path):
+    path = str(tmp_path / 'cache.db')
+    expected = model.process_for_blockchain(data[:30])
+
+    model.enable_cache(disk_path=path)
+    model.process_for_blockchain(data[:30])
+    other = ResultCache(disk_path=path)
+    model.enable_cache(other)
+
+    assert model.process_for_blockchain(data[:30]) == expected
+    assert other.stats()['disk_hits'] == 30
+    assert other.stats()['misses'] == 0
+
+
+def test_expired_entries_are_recomputed(data, tmp_path):
+    model = fit_model(data)
+    cache = model.enable_cache(ttl=0.05, disk_path=str(tmp_path / 'cache.db'))
+
+    model.process_for_blockchain(data[:10])
+    time.sleep(0.1)
+    model.process_for_blockchain(data[:10])
+
+    stats = cache.stats()
+    assert stats['misses'] == 20
+    assert stats['expirations'] >= 10
+    assert cache.purge_expired() == 0
+
+
+def test_refit_changes_version(data):
+    model = fit_model(data)
+    version = model.model_version()
+    np.random.seed(1)
+    model.fit(data, ae_epochs=3, verbose=False)
+
+    assert model.model_version() != version
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from h_pcae_evaluation import evaluate_hpcae, _DigestBuckets, _forward
+
+
+def test_exact_duplicates_are_near_collisions(model, data):
+    X = data.copy()
+    X[1::2] = X[0::2]
+
+    stats = evaluate_hpcae(model, X, n_neighbors=5, sample_size=len(X), chunk_size=97)
+
+    assert stats['collisions']['near_collisions'] == len(X)
+    assert stats['collisions']['min_sampled_nearest_distance'] == 0.0
+    assert stats['collisions']['mean_nearest_distance'] == 0.0
+    assert stats['hash_collisions']['colliding_rows'] == len(X) // 2
+
+
+def test_metrics_do_not_depend_on_chunking(model, data):
+    a = evaluate_hpcae(model, data, n_neighbors=5, sample_size=200, chunk_size=64, n_jobs=3)
+    b = evaluate_hpcae(model, data, n_neighbors=5, sample_size=200, chunk_size=len(data), n_jobs=1)
+
+    assert a['neighbour_preservation'] == b['neighbour_preservation']
+    assert a['hash_collisions'] == b['hash_collisions']
+    assert np.isclose(a['reconstruction']['mse'], b['reconstruction']['mse'])
+
+
+def test_reconstruction_mse_matches_direct_computation(model, data):
+    _, X_pca, X_latent, _ = _forward(model, data)
+    expected = np.mean((X_pca - model.autoencoder.decode(X_latent)) ** 2)
+
+    stats = evaluate_hpcae(model, data, sample_size=10, chunk_size=128)
+
+    assert np.isclose(stats['reconstruction']['mse'], expected, rtol=1e-5)
+
+
+def test_digest_buckets_count_unique(tmp_path):
+    rng = np.random.default_rng(0)
+    digests = rng.integers(0, 256, size=(5000, 32), dtype=np.uint8).view('S32').ravel()
+    buckets = _DigestBuckets(str(tmp_path))
+    buckets.add(digests[:3000])
+    buckets.add(digests[2000:])
+
+    assert buckets.n_digests == 6000
+    assert buckets.count_unique() == np.unique(digests).shape[0]
+
+
+def test_forward_matches_transform_and_scales_once(model, data, monkeypatch):
+    calls = []
+    transform = model.scaler.transform
+    monkeypatch.setattr(model.scaler, 'transform', lambda X: calls.append(len(X)) or transform(X))
+
+    X_scaled, _, _, X_final = _forward(model, data[:300])
+
+    assert calls == [300]
+    assert np.array_equal(X_final, model.transform(data[:300]))
+    assert np.array_equal(X_scaled, transform(data[:300].astype(model.dtype)))
+
+
+def test_workers_run_single_threaded_blas(model, data, monkeypatch):
+    threadpoolctl = pytest.importorskip('threadpoolctl')
+    import h_pcae_evaluation
+    seen = []
+    evaluate_chunk = h_pcae_evaluation._evaluate_chunk
+
+    def recording_chunk(*args):
+        seen.extend(info['num_threads'] for info in threadpoolctl.threadpool_info()
+                    if info['user_api'] == 'blas')
+        return evaluate_chunk(*args)
+
+    monkeypatch.setattr(h_pcae_evaluation, '_evaluate_chunk', recording_chunk)
+    with threadpoolctl.threadpool_limits(limits=2, user_api='blas'):
+        evaluate_hpcae(model, data, sample_size=10, chunk_size=200, n_jobs=2)
+
+    assert seen and set(seen) == {1}
@@ -0,0 +1,129 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+import h_pcae_planner
+from conftest import fit_model
+from h_pcae_algorithm import HPCAE, ROW_BLOCK, create_sample_student_data
+
+
+@pytest.fixture
+def small_plans(monkeypatch):
+    """Plan small transforms, keep calibration fast and count how often it runs."""
+    monkeypatch.setattr(h_pcae_planner, 'PLANNED_MIN_ROWS', 256)
+    calls = []
+    calibrate = h_pcae_planner.calibrate
+
+    def counting_calibrate(model, **kwargs):
+        calls.append(model)
+        return calibrate(model, repeats=1, **kwargs)
+
+    monkeypatch.setattr(h_pcae_planner, 'calibrate', counting_calibrate)
+    return calls
+
+
+def single_threaded_plan(chunk_size):
+    return {'chunk_size': chunk_size, 'stages': {'pca': {'threads': 1}, 'autoencoder': {'threads': 1}}}
+
+
+@pytest.mark.parametrize('chunk_size', [12, 1000])
+@pytest.mark.parametrize('n_rows', [1, 999, 1000, 2001, 2257])
+def test_planned_output_matches_unplanned(model, chunk_size, n_rows):
+    X = create_sample_student_data(n_samples=n_rows, n_features=64, random_state=1)
+    expected = model.transform(X)
+
+    planned = h_pcae_planner.planned_transform(model, X.astype(model.dtype), single_threaded_plan(chunk_size))
+
+    assert planned.dtype == model.dtype
+    assert np.array_equal(planned, expected)
+
+
+def test_limits_are_entered_once_per_stage_under_the_lock(model, monkeypatch):
+    entered = []
+    limits = h_pcae_planner._limits
+
+    def recording_limits(threads):
+        entered.append(h_pcae_planner._LIMITS_LOCK.locked())
+        return limits(threads)
+
+    monkeypatch.setattr(h_pcae_planner, '_limits', recording_limits)
+    X = create_sample_student_data(n_samples=2001, n_features=64).astype(model.dtype)
+
+    h_pcae_planner.planned_transform(model, X, single_threaded_plan(16))
+
+    assert entered == [True, True]
+
+
+def test_chunk_rows_follow_the_memory_budget(model):
+    small = h_pcae_planner.chunk_rows(model, 1 << 20)
+    large = h_pcae_planner.chunk_rows(model, 1 << 24)
+
+    assert small % ROW_BLOCK == 0 and large % ROW_BLOCK == 0
+    assert ROW_BLOCK < small < large <= 16 * (small + ROW_BLOCK)
+    assert h_pcae_planner.chunk_rows(model, 1) == ROW_BLOCK
+
+
+def test_planned_hashes_match_unplanned(model, data, small_plans):
+    expected = model.process_for_blockchain(data)
+
+    model.plan_execution(chunk_bytes=1 << 16)
+
+    assert model.execution_plan['chunk_size'] < len(data)
+    assert model.process_for_blockchain(data) == expected
+
+
+def test_auto_plan_is_on_by_default():
+    assert HPCAE().auto_plan
+    legacy = HPCAE()
+    del legacy.__dict__['auto_plan']
+    assert pickle.loads(pickle.dumps(legacy)).auto_plan
+
+
+def test_fit_unpickle_and_astype_do_not_calibrate(data, small_plans):
+    model = fit_model(data, auto_plan=True)
+    loaded = pickle.loads(pickle.dumps(model))
+    converted = model.astype(np.float32)
+
+    assert small_plans == []
+    assert model.execution_plan is None
+    assert loaded.execution_plan is None
+    assert converted.execution_plan is None
+
+
+def test_auto_plan_calibrates_on_first_large_transform(data, small_plans):
+    model = fit_model(data, auto_plan=True)
+
+    model.transform(data[:100])
+    assert small_plans == []
+
+    model.transform(data)
+    model.transform(data)
+    assert len(small_plans) == 1
+    assert model.execution_plan['source'] == 'calibrated'
+    assert model.get_compression_stats()['execution_plan'] is model.execution_plan
+
+
+def test_plan_cache_is_reused(data, small_plans):
+    model = fit_model(data)
+    model.plan_execution()
+    loaded = pickle.loads(pickle.dumps(model))
+
+    plan = loaded.plan_execution()
+
+    assert len(small_plans) == 1
+    assert plan['source'] == 'cache'
+    assert plan['chunk_size'] == h_pcae_planner.chunk_rows(model)
+
+
+def test_plans_from_the_old_format_are_recalibrated(data, small_plans, plan_cache):
+    model = fit_model(data)
+    key = f'{h_pcae_planner.host_fingerprint()}:{h_pcae_planner.model_signature(model)}'
+    with open(plan_cache, 'w') as f:
+        json.dump({key: {'chunk_size': 512, 'stages': {}}}, f)
+
+    plan = model.plan_execution()
+
+    assert plan['source'] == 'calibrated'
+    assert len(small_plans) == 1
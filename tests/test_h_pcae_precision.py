@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from h_pcae_algorithm import HPCAE, DeepAutoencoder, ROW_BLOCK
+from conftest import fit_model
+
+
+def test_float32_mode_keeps_float32_throughout(data):
+    model = fit_model(data, dtype=np.float32)
+    ae = model.autoencoder
+
+    assert all(w.dtype == np.float32 for w in ae.encoder_weights + ae.decoder_weights)
+    assert model.pca.components_.dtype == np.float32
+    assert model.transform(data).dtype == np.float32
+    assert ae._noise((4, 4)).dtype == np.float32
+
+
+def test_hashes_do_not_depend_on_batch_size(model, data):
+    X = data[:10 * ROW_BLOCK + 3]
+
+    batch = model.process_for_blockchain(X)
+    single = [model.process_for_blockchain(row)['blockchain_hash'] for row in X]
+    pairs = [r['blockchain_hash'] for i in range(0, len(X), 7)
+             for r in np.atleast_1d(model.process_for_blockchain(X[i:i + 7]))]
+
+    assert [r['blockchain_hash'] for r in batch] == single == pairs
+
+
+def test_hashes_do_not_depend_on_weight_layout(model, data):
+    expected = model.transform(data)
+
+    model.pca.components_ = np.asfortranarray(model.pca.components_)
+    ae = model.autoencoder
+    ae.encoder_weights[:] = [np.asfortranarray(w) for w in ae.encoder_weights]
+
+    assert np.array_equal(model.transform(data), expected)
+
+
+def test_float64_training_noise_keeps_the_legacy_stream():
+    np.random.seed(5)
+    ae = DeepAutoencoder(16, 4)
+    noise = ae._noise((3, 2))
+
+    np.random.seed(5)
+    for w in ae.encoder_weights + ae.decoder_weights:
+        np.random.randn(*w.shape)
+
+    assert np.array_equal(noise, np.random.randn(3, 2))
+
+
+def test_astype_measures_and_enforces_deviation(data):
+    model = fit_model(data)
+    X_check = data[:200]
+
+    model32 = model.astype(np.float32, X_check=X_check)
+
+    assert model32.dtype == np.float32
+    assert model32.precision_deviation <= 1e-2
+    deviation = np.max(np.abs(model32.transform(X_check) - model.transform(X_check)))
+    assert deviation == pytest.approx(model32.precision_deviation)
+
+    with pytest.raises(ValueError, match='exceeds tolerance'):
+        model.astype(np.float32, X_check=X_check, tolerance=0.0)
+
+
+def test_invalid_dtype_is_rejected():
+    with pytest.raises(ValueError):
+        HPCAE(dtype=np.float16)
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from h_pcae_workload import SyntheticWorkload
+
+
+@pytest.mark.parametrize('n_samples', [1001, 1002, 1003])
+def test_small_tail_chunks_keep_an_original(n_samples):
+    workload = SyntheticWorkload(n_samples, 8, chunk_size=1000, duplicate_rate=0.4, near_duplicate_rate=0.4)
+
+    data, sources = workload.generate_chunk(workload.n_chunks - 1, return_sources=True)
+
+    assert data.shape == (n_samples - 1000, 8)
+    assert (sources == -1).any()
+
+
+def test_duplicates_copy_their_source_rows():
+    workload = SyntheticWorkload(500, 16, chunk_size=200, duplicate_rate=0.1, near_duplicate_rate=0.1,
+                                 near_duplicate_noise=1e-3)
+    X = np.concatenate(list(workload.iter_chunks()))
+
+    for index in range(workload.n_chunks):
+        start, _ = workload.chunk_bounds(index)
+        _, sources = workload.generate_chunk(index, return_sources=True)
+        copies = np.nonzero(sources >= 0)[0]
+        n_dup = int(round(len(sources) * 0.1))
+        diff = np.abs(X[start + copies] - X[sources[copies]]).max(axis=1)
+        assert (diff == 0).sum() >= n_dup
+        assert diff.max() < 1e-2
+
+
+def test_output_does_not_depend_on_workers(tmp_path):
+    workload = SyntheticWorkload(2500, 12, chunk_size=512, n_factors=3, duplicate_rate=0.05)
+
+    serial = workload.write_npy(str(tmp_path / 'serial.npy'), n_jobs=1)
+    parallel = workload.write_npy(str(tmp_path / 'parallel.npy'), n_jobs=2)
+
+    assert np.array_equal(serial, parallel)
+    assert np.array_equal(serial, np.concatenate(list(workload.iter_chunks())))
+
+
+def test_rejects_impossible_rates():
+    with pytest.raises(ValueError):
+        SyntheticWorkload(10, duplicate_rate=0.5, near_duplicate_rate=0.5)
+
+
+def test_stride_one_builds_a_correlation_chain():
+    workload = SyntheticWorkload(20000, 6, chunk_size=5000, correlation_stride=1,
+                                 correlation_strength=0.8, correlation_noise=0.2, dtype=np.float64)
+    X = np.concatenate(list(workload.iter_chunks()))
+
+    corr = np.corrcoef(X, rowvar=False)
+    chain = [corr[j, j + 1] for j in range(5)]
+
+    assert min(chain) > 0.75
+    assert corr[0, 5] > 0.3
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    workload = SyntheticWorkload(1300, 7, chunk_size=500, n_factors=2, duplicate_rate=0.1)
+
+    paths = workload.write_parquet(str(tmp_path / 'parts'), n_jobs=2)
+
+    assert len(paths) == workload.n_chunks
+    for path, expected in zip(paths, workload.iter_chunks()):
+        table = pq.read_table(path)
+        assert table.column_names == [f'f{j}' for j in range(7)]
+        data = np.column_stack([table.column(name).to_numpy() for name in table.column_names])
+        assert data.dtype == workload.dtype
+        assert np.array_equal(data, expected)